@@ -0,0 +1,465 @@
+"""
+Shared utilities for the Python chunker bridges.
+
+Consolidates the line-number bookkeeping and the persistent ``--server`` loop
+used by the chonkie, llamaindex, and langchain bridges. Imported by sibling
+scripts; numpy is used when available but is not required.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+from functools import lru_cache
+from multiprocessing import get_context
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional (e.g. langchain-only environments)
+    np = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; the builtin hash is the fallback
+    xxhash = None
+
+# Serialized responses kept by --server mode for repeated identical requests
+RESULT_CACHE_SIZE = 256
+
+# Chunk size the benchmark uses when none is configured (see chunker-registry.ts)
+DEFAULT_CHUNK_SIZE = 1500
+
+_start_index = attrgetter("start_index")
+_end_index = attrgetter("end_index")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to JSON bytes, using orjson's C serializer when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def write_json(obj: Any) -> None:
+    """Write obj to stdout as a single JSON line, bypassing the text layer."""
+    _write_line(dumps(obj))
+
+
+def write_json_array(items: Iterable[Any]) -> None:
+    """Write items to stdout as a single JSON array line, one element at a time.
+
+    Each element is serialized and written on its own, so the full serialized
+    array never exists in memory alongside the chunk records.
+    """
+    out = sys.stdout.buffer
+    out.write(b"[")
+    sep = b""
+    for item in items:
+        out.write(sep)
+        out.write(dumps(item))
+        sep = b","
+    out.write(b"]\n")
+    out.flush()
+
+
+def _write_line(data: bytes) -> None:
+    out = sys.stdout.buffer
+    out.write(data)
+    out.write(b"\n")
+    out.flush()
+
+
+def content_hash(data: bytes) -> int:
+    """Fast non-cryptographic hash of request bytes, for in-process caching."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return hash(data)
+
+
+@lru_cache(maxsize=None)
+def tree_sitter_parser(language: str) -> Any:
+    """Return the process-wide tree-sitter Parser for language.
+
+    Chunkers that accept an injected parser share this one instance per
+    language instead of each loading the grammar again. Returns None when
+    tree-sitter-language-pack is not installed, so callers fall back to their
+    own parser loading.
+    """
+    try:
+        from tree_sitter_language_pack import get_parser
+    except ImportError:
+        return None
+    return get_parser(language)
+
+
+def newline_offsets(code: str) -> Sequence[int]:
+    """Return the character offset of every newline in code, in ascending order.
+
+    Computed once per file so that each chunk's line numbers can be resolved
+    with a binary search instead of re-counting the file prefix. With numpy
+    the scan runs in C over the encoded buffer: ASCII code is scanned
+    byte-wise, anything else as UTF-32 so offsets stay character offsets.
+    """
+    if np is not None:
+        if code.isascii():
+            buf = np.frombuffer(code.encode("ascii"), dtype=np.uint8)
+        else:
+            buf = np.frombuffer(code.encode("utf-32-le"), dtype=np.uint32)
+        return np.flatnonzero(buf == 0x0A)
+
+    offsets = []
+    find = code.find
+    idx = find("\n")
+    while idx != -1:
+        offsets.append(idx)
+        idx = find("\n", idx + 1)
+    return offsets
+
+
+def span_indices(chunks: Sequence[Any]) -> tuple[Sequence[int], Sequence[int]]:
+    """Return the ``start_index`` and ``end_index`` of every chunk as two columns.
+
+    The attributes are read with ``operator.attrgetter`` over ``map``; with
+    numpy the values go straight into preallocated int64 arrays (the form
+    line_ranges consumes) rather than through intermediate lists of ints.
+    """
+    if np is not None:
+        count = len(chunks)
+        return (
+            np.fromiter(map(_start_index, chunks), dtype=np.int64, count=count),
+            np.fromiter(map(_end_index, chunks), dtype=np.int64, count=count),
+        )
+    return list(map(_start_index, chunks)), list(map(_end_index, chunks))
+
+
+def line_ranges(
+    offsets: Any, start_indices: Sequence[int], end_indices: Sequence[int]
+) -> tuple[list[int], list[int]]:
+    """Convert every chunk's character span into 1-indexed line numbers at once.
+
+    Equivalent to ``code[:index].count("\\n") + 1`` for each index: counts
+    newlines strictly before it. Chunkers emit chunks in source order, so both
+    ends of every span are resolved in a single ordered pass: with numpy, one
+    searchsorted over the interleaved (start, end) indices (which numpy narrows
+    using the previous hit when keys ascend); otherwise a lockstep bisect whose
+    lower bound carries over from the previous boundary.
+
+    Returns:
+        (start_lines, end_lines), parallel to the input index sequences.
+    """
+    if np is not None and isinstance(offsets, np.ndarray):
+        bounds = np.empty(2 * len(start_indices), dtype=np.int64)
+        bounds[0::2] = start_indices
+        bounds[1::2] = end_indices
+        lines = np.searchsorted(offsets, bounds) + 1
+        return lines[0::2].tolist(), lines[1::2].tolist()
+
+    start_lines = []
+    end_lines = []
+    lo = 0
+    prev_start = 0
+    for start, end in zip(start_indices, end_indices):
+        if start < prev_start:  # out-of-order chunk; restart the scan
+            lo = 0
+        lo = bisect_left(offsets, start, lo)
+        start_lines.append(lo + 1)
+        end_lines.append(bisect_left(offsets, end, lo if end >= start else 0) + 1)
+        prev_start = start
+    return start_lines, end_lines
+
+
+def chunk_results(
+    filepath: str,
+    texts: Sequence[str],
+    start_lines: Sequence[int],
+    end_lines: Sequence[int],
+) -> list[dict[str, Any]]:
+    """Assemble the bridge output records from parallel chunk columns.
+
+    Ids (``<filepath>:<start>-<end>``) are built in one pass with the filepath
+    prefix formatted once, rather than per chunk inside the record loop.
+    """
+    prefix = f"{filepath}:"
+    ids = [f"{prefix}{s}-{e}" for s, e in zip(start_lines, end_lines)]
+    return [
+        {"id": chunk_id, "text": text, "startLine": s, "endLine": e}
+        for chunk_id, text, s, e in zip(ids, texts, start_lines, end_lines)
+    ]
+
+
+def whole_file_result(
+    filepath: str, code: str, strip: bool = False
+) -> list[dict[str, Any]]:
+    """Bridge output for a file that fits in a single chunk.
+
+    The one chunk is the whole file, minus surrounding whitespace when strip
+    is set (for splitters that strip their chunks). Blank text has no chunks.
+    """
+    start = len(code) - len(code.lstrip()) if strip else 0
+    text = code[start:].rstrip() if strip else code
+    if not text:
+        return []
+    end = start + len(text)
+    return chunk_results(
+        filepath, [text], [code.count("\n", 0, start) + 1], [code.count("\n", 0, end) + 1]
+    )
+
+
+def _read_frame(header: bytes, stdin: Any) -> tuple[dict[str, Any], bytes]:
+    """Parse one request header and read the code bytes that follow it.
+
+    Only a header without a usable ``len`` fails here: the body is consumed
+    before anything else is validated, so a bad request cannot leave its code
+    bytes to be read as further headers.
+    """
+    request = json.loads(header)
+    return request, stdin.read(request["len"])
+
+
+def _request_key(request: dict[str, Any], data: bytes) -> tuple[tuple, list[str]]:
+    """Return (cache key, bridge args) for a request read by _read_frame."""
+    args = request["args"]
+    return (tuple(args), content_hash(data)), args
+
+
+def _write_response(request_id: Any, payload: bytes) -> None:
+    """Write one response line, tagged with the id of the request it answers."""
+    _write_line(b'{"id":' + dumps(request_id) + b',"response":' + payload + b"}")
+
+
+def _respond(
+    handler: Callable[[list[str], str], Any], args: list[str], data: bytes
+) -> tuple[bool, bytes]:
+    """Run handler on one request and serialize the outcome.
+
+    Module-level (and returning bytes rather than chunk records) so it can run
+    in a pool worker and send back a cheap-to-pickle result.
+
+    Returns:
+        (succeeded, serialized response)
+    """
+    try:
+        # Keep stray library prints from corrupting the response stream
+        with redirect_stdout(sys.stderr):
+            results = handler(args, data.decode("utf-8"))
+        return True, dumps(results)
+    except Exception as e:
+        return False, dumps({"error": str(e)})
+
+
+def _preload(preload: Callable[[str], None], languages: Sequence[str]) -> None:
+    """Warm each language up front (in every worker, when pooled).
+
+    A language that fails to load is reported on stderr rather than taking the
+    server down; requests for it then fail (or load lazily) as before.
+    """
+    for language in languages:
+        try:
+            with redirect_stdout(sys.stderr):
+                preload(language)
+        except Exception as e:
+            print(f"Could not preload {language!r}: {e}", file=sys.stderr)
+
+
+# Set in each pool worker by _init_worker; see _serve_pool
+_workers_started: Any = None
+
+
+def _init_worker(
+    warmup: tuple[Callable[[str], None], Sequence[str]], started: Any
+) -> None:
+    """Pool worker initializer: preload, keeping the startup barrier for _worker_ready."""
+    global _workers_started
+    _workers_started = started
+    _preload(*warmup)
+
+
+def _worker_ready() -> None:
+    """Pool task that returns once every worker has finished its preload."""
+    _workers_started.wait()
+
+
+def _server_options(args: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} --server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="chunker processes; 0 means one per CPU (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--preload",
+        type=lambda value: [name for name in value.split(",") if name],
+        default=[],
+        metavar="LANGS",
+        help="comma-separated languages or file extensions to load at startup",
+    )
+    return parser.parse_args(args)
+
+
+def serve(
+    handler: Callable[[list[str], str], Any],
+    args: Sequence[str] = (),
+    preload: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Answer chunking requests from stdin until EOF (the bridges' ``--server`` mode).
+
+    Each request is a JSON header line ``{"id": ..., "args": [...], "len": N}``
+    followed by exactly N bytes of UTF-8 source code, where ``args`` are the
+    bridge's one-shot command-line arguments. Each response is a single JSON
+    line ``{"id": ..., "response": ...}`` echoing the request's id, with the
+    chunk array, or ``{"error": ...}`` if that request failed. Responses are
+    written in request order, so one process can serve a whole benchmark run
+    and pay the interpreter startup and chunker import cost once.
+
+    The serialized responses of the last RESULT_CACHE_SIZE successful requests
+    are kept, keyed by args and a hash of the code, so re-chunking the same
+    file with the same configuration (e.g. repeated sweeps) is answered
+    without running the chunker again.
+
+    ``args`` are the server options following ``--server``. With
+    ``--workers N`` (N > 1, or 0 for one per CPU) requests are chunked in
+    parallel by a pool of spawned worker processes. That only helps when
+    requests overlap, e.g. several benchmark providers sharing one bridge;
+    a single client awaiting each response in turn gains nothing from it.
+
+    With ``--preload LANGS``, ``preload`` is called for each listed language
+    before the first request is read (in every worker, when pooled), so
+    grammar loading is not charged to the first file of each language.
+    Bridges without a ``preload`` hook accept and ignore the option.
+    """
+    options = _server_options(args)
+    workers = options.workers
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    warmup = (preload, options.preload) if preload and options.preload else None
+
+    if workers > 1:
+        _serve_pool(handler, workers, warmup)
+    else:
+        if warmup:
+            _preload(*warmup)
+        _serve_inline(handler)
+
+
+def _serve_inline(handler: Callable[[list[str], str], Any]) -> None:
+    stdin = sys.stdin.buffer
+    cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+    for header in stdin:
+        if not header.strip():
+            continue
+        request_id = None
+        try:
+            request, data = _read_frame(header, stdin)
+            request_id = request.get("id")
+            key, args = _request_key(request, data)
+        except Exception as e:
+            _write_response(request_id, dumps({"error": str(e)}))
+            continue
+
+        response = cache.get(key)
+        if response is not None:
+            cache.move_to_end(key)
+        else:
+            ok, response = _respond(handler, args, data)
+            if ok:
+                cache[key] = response
+                if len(cache) > RESULT_CACHE_SIZE:
+                    cache.popitem(last=False)
+
+        _write_response(request_id, response)
+
+
+def _serve_pool(
+    handler: Callable[[list[str], str], Any],
+    workers: int,
+    warmup: Optional[tuple[Callable[[str], None], list[str]]] = None,
+) -> None:
+    """Serve with a process pool; futures are written back in submission order.
+
+    Workers are spawned rather than forked (tree-sitter parsers are not
+    fork-safe everywhere) and build their chunkers lazily through the
+    bridges' cached factories, unless warmup asks for some to be preloaded;
+    then every worker is started and warmed before the first request is
+    read. The cache holds futures, so a request that repeats one still in
+    flight shares its result; failed ones are evicted.
+    """
+    stdin = sys.stdin.buffer
+    cache: "OrderedDict[tuple, Future]" = OrderedDict()
+    lock = threading.Lock()
+    responses: "queue.Queue[Optional[tuple[Any, Optional[tuple], Future]]]" = (
+        queue.Queue()
+    )
+
+    def write_responses() -> None:
+        while (item := responses.get()) is not None:
+            request_id, key, future = item
+            try:
+                ok, response = future.result()
+            except Exception as e:  # e.g. a worker process died
+                ok, response = False, dumps({"error": str(e)})
+            if not ok and key is not None:
+                with lock:
+                    if cache.get(key) is future:
+                        del cache[key]
+            _write_response(request_id, response)
+
+    context = get_context("spawn")
+    # Synchronization primitives can only reach workers at process start
+    started = context.Barrier(workers) if warmup else None
+
+    writer = threading.Thread(target=write_responses)
+    writer.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker if warmup else None,
+            initargs=(warmup, started) if warmup else (),
+        ) as pool:
+            if warmup:
+                # Workers only start with the first submitted job. Each
+                # _worker_ready blocks on the barrier until all workers have
+                # preloaded, so every worker takes exactly one of them.
+                wait([pool.submit(_worker_ready) for _ in range(workers)])
+
+            for header in stdin:
+                if not header.strip():
+                    continue
+                request_id = None
+                try:
+                    request, data = _read_frame(header, stdin)
+                    request_id = request.get("id")
+                    key, args = _request_key(request, data)
+                except Exception as e:
+                    failed: Future = Future()
+                    failed.set_result((False, dumps({"error": str(e)})))
+                    responses.put((request_id, None, failed))
+                    continue
+
+                with lock:
+                    future = cache.get(key)
+                    if future is not None:
+                        cache.move_to_end(key)
+                    else:
+                        future = cache[key] = pool.submit(_respond, handler, args, data)
+                        if len(cache) > RESULT_CACHE_SIZE:
+                            cache.popitem(last=False)
+                responses.put((request_id, key, future))
+    finally:
+        responses.put(None)
+        writer.join()
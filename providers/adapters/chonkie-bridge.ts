@@ -1,7 +1,8 @@
 /**
  * Chonkie Python Bridge
  *
- * TypeScript wrapper for calling Chonkie Python chunkers via subprocess.
+ * TypeScript wrapper for calling Chonkie Python chunkers via a persistent
+ * subprocess (started once, reused for every file).
  * Supports both CodeChunker (semantic) and RecursiveChunker (character fallback).
  *
  * Requirements:
@@ -12,7 +13,13 @@
 
 import { dirname, join } from "node:path";
 import { fileURLToPath } from "node:url";
-import { callPythonBridge, isPythonPackageAvailable } from "./python-bridge-utils.ts";
+import {
+	callPythonBridgeServer,
+	closePythonBridgeServers,
+	isPythonPackageAvailable,
+	releasePythonBridgeServers,
+	retainPythonBridgeServers,
+} from "./python-bridge-utils.ts";
 
 // Resolve path to the Python script
 const __dirname = dirname(fileURLToPath(import.meta.url));
@@ -51,7 +58,7 @@ export interface ChonkieOptions {
 }
 
 /**
- * Call Chonkie Python chunker via subprocess.
+ * Call Chonkie Python chunker via the persistent bridge subprocess.
  *
  * @param filepath - File path (used for language detection)
  * @param code - Source code content
@@ -64,19 +71,14 @@ export async function callChonkie(
 	options: ChonkieOptions,
 ): Promise<ChonkieChunkResult[]> {
 	const pythonPath = options.pythonPath || process.env.CHONKIE_PYTHON_PATH || "python3";
-	const args = [
-		SCRIPT_PATH,
-		options.chunkerType,
-		filepath,
-		String(options.chunkSize),
-	];
+	const args = [options.chunkerType, filepath, String(options.chunkSize)];
 
 	if (options.overlap !== undefined) {
 		args.push(String(options.overlap));
 	}
 
 	try {
-		return await callPythonBridge<ChonkieChunkResult[]>(
+		return await callPythonBridgeServer<ChonkieChunkResult[]>(
 			SCRIPT_PATH,
 			args,
 			code,
@@ -100,3 +102,25 @@ export async function isChonkieAvailable(
 ): Promise<boolean> {
 	return isPythonPackageAvailable(pythonPath, "import chonkie");
 }
+
+/**
+ * Shut down the persistent Chonkie bridge process(es).
+ */
+export async function closeChonkie(): Promise<void> {
+	await closePythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Register a user of the Chonkie bridge process (see {@link releaseChonkie}).
+ */
+export function retainChonkie(): void {
+	retainPythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Release a user registered with {@link retainChonkie}; the bridge process is
+ * shut down once the last user releases it.
+ */
+export async function releaseChonkie(): Promise<void> {
+	await releasePythonBridgeServers(SCRIPT_PATH);
+}
@@ -7,6 +7,7 @@ Supports both CodeChunker (semantic) and RecursiveChunker (character fallback).
 
 Usage:
     python chonkie_bridge.py <chunker_type> <filepath> <chunk_size> [<overlap>]
+    python chonkie_bridge.py --server [--workers N] [--preload LANGS]
     
     chunker_type: "code" or "recursive"
     filepath: Path to the file (used for language detection)
@@ -15,73 +16,138 @@ Usage:
     
 Code is read from stdin. Output is JSON array of chunks.
 
+With --server, the process stays alive and answers newline-delimited requests
+whose args mirror the command line above (see bridge_utils.serve).
+--workers N chunks up to N requests in parallel (0: one worker per CPU).
+--preload LANGS (e.g. py,ts,go) loads those grammars before the first request.
+
 Install dependencies:
     uv pip install chonkie tree-sitter-language-pack
 """
 
-import json
 import sys
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 
+from bridge_utils import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_results,
+    line_ranges,
+    newline_offsets,
+    serve,
+    span_indices,
+    tree_sitter_parser,
+    whole_file_result,
+    write_json,
+    write_json_array,
+)
+
+
+# File extension -> tree-sitter language name
+_LANG_MAP = MappingProxyType({
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "tsx": "tsx",
+    "jsx": "javascript",
+    "rs": "rust",
+    "go": "go",
+    "java": "java",
+    "c": "c",
+    "cpp": "cpp",
+    "h": "c",
+    "hpp": "cpp",
+    "rb": "ruby",
+    "php": "php",
+    "cs": "c_sharp",
+    "swift": "swift",
+    "kt": "kotlin",
+    "scala": "scala",
+})
+
 
 def get_language_from_filepath(filepath: str) -> str:
     """Determine programming language from file extension."""
-    ext = filepath.rsplit(".", 1)[-1].lower() if "." in filepath else ""
-    lang_map = {
-        "py": "python",
-        "js": "javascript",
-        "ts": "typescript",
-        "tsx": "tsx",
-        "jsx": "javascript",
-        "rs": "rust",
-        "go": "go",
-        "java": "java",
-        "c": "c",
-        "cpp": "cpp",
-        "h": "c",
-        "hpp": "cpp",
-        "rb": "ruby",
-        "php": "php",
-        "cs": "c_sharp",
-        "swift": "swift",
-        "kt": "kotlin",
-        "scala": "scala",
-    }
-    return lang_map.get(ext, "python")
+    _, sep, ext = filepath.rpartition(".")
+    return _LANG_MAP.get(ext.lower(), "python") if sep else "python"
 
 
-def chunk_with_code_chunker(
-    code: str, filepath: str, chunk_size: int
-) -> list[dict[str, Any]]:
-    """Chunk using Chonkie's CodeChunker (tree-sitter semantic chunking)."""
-    from chonkie import CodeChunker
+# Chunker factories are cached so a --server process builds each configuration
+# (and loads each tree-sitter grammar) once rather than per file.
 
-    language = get_language_from_filepath(filepath)
 
-    chunker = CodeChunker(
+@lru_cache(maxsize=64)
+def _get_code_chunker(language: str, chunk_size: int) -> "CodeChunker":
+    from chonkie import CodeChunker
+
+    return CodeChunker(
         language=language,
         tokenizer="character",  # Use character count
         chunk_size=chunk_size,
     )
 
+
+@lru_cache(maxsize=64)
+def _get_recursive_chunker(chunk_size: int) -> "RecursiveChunker":
+    from chonkie import RecursiveChunker
+
+    return RecursiveChunker(
+        tokenizer="character",  # Use character count
+        chunk_size=chunk_size,
+    )
+
+
+# Each SemanticChunker loads its own embedding model, so only the latest
+# configuration is kept; a chunk-size sweep frees the previous model.
+@lru_cache(maxsize=1)
+def _get_semantic_chunker(chunk_size: int) -> "SemanticChunker":
+    from chonkie import SemanticChunker
+
+    return SemanticChunker(
+        chunk_size=chunk_size,
+        similarity_threshold=0.5,
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_token_chunker(chunk_size: int, overlap: int) -> "TokenChunker":
+    from chonkie import TokenChunker
+
+    return TokenChunker(
+        tokenizer="character",  # Use character count for consistency with other chunkers
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_sentence_chunker(chunk_size: int) -> "SentenceChunker":
+    from chonkie import SentenceChunker
+
+    return SentenceChunker(
+        tokenizer="character",  # Use character count
+        chunk_size=chunk_size,
+        min_sentences_per_chunk=1,
+    )
+
+
+def chunk_with_code_chunker(
+    code: str, filepath: str, chunk_size: int
+) -> list[dict[str, Any]]:
+    """Chunk using Chonkie's CodeChunker (tree-sitter semantic chunking)."""
+    language = get_language_from_filepath(filepath)
+
+    chunker = _get_code_chunker(language, chunk_size)
+
     chunks = chunker.chunk(code)
 
-    results = []
-    for chunk in chunks:
-        # Calculate line numbers from character indices
-        start_line = code[: chunk.start_index].count("\n") + 1  # 1-indexed
-        end_line = code[: chunk.end_index].count("\n") + 1
-
-        results.append(
-            {
-                "id": f"{filepath}:{start_line}-{end_line}",
-                "text": chunk.text,
-                "startLine": start_line,
-                "endLine": end_line,
-            }
-        )
+    # Calculate line numbers from character indices (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), *span_indices(chunks))
 
-    return results
+    return chunk_results(
+        filepath, [chunk.text for chunk in chunks], start_lines, end_lines
+    )
 
 
 def chunk_with_recursive_chunker(
@@ -92,165 +158,150 @@ def chunk_with_recursive_chunker(
     Note: RecursiveChunker doesn't support overlap directly.
     Overlap would need OverlapRefinery post-processing.
     """
-    from chonkie import RecursiveChunker
+    # Built (and cached) first so invalid settings are rejected for any file
+    chunker = _get_recursive_chunker(chunk_size)
 
-    chunker = RecursiveChunker(
-        tokenizer="character",  # Use character count
-        chunk_size=chunk_size,
-    )
+    if len(code) <= chunk_size:  # fits in one chunk; skip chunking
+        return whole_file_result(filepath, code)
 
     chunks = chunker.chunk(code)
 
-    results = []
-    for chunk in chunks:
-        # Calculate line numbers from character indices
-        start_line = code[: chunk.start_index].count("\n") + 1  # 1-indexed
-        end_line = code[: chunk.end_index].count("\n") + 1
-
-        results.append(
-            {
-                "id": f"{filepath}:{start_line}-{end_line}",
-                "text": chunk.text,
-                "startLine": start_line,
-                "endLine": end_line,
-            }
-        )
+    # Calculate line numbers from character indices (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), *span_indices(chunks))
 
-    return results
+    return chunk_results(
+        filepath, [chunk.text for chunk in chunks], start_lines, end_lines
+    )
 
 
 def chunk_with_semantic_chunker(
     code: str, filepath: str, chunk_size: int
 ) -> list[dict[str, Any]]:
     """Chunk using Chonkie's SemanticChunker (embedding-based boundaries)."""
-    from chonkie import SemanticChunker
-
-    chunker = SemanticChunker(
-        chunk_size=chunk_size,
-        similarity_threshold=0.5,
-    )
+    chunker = _get_semantic_chunker(chunk_size)
 
     chunks = chunker.chunk(code)
 
-    results = []
-    for chunk in chunks:
-        start_line = code[: chunk.start_index].count("\n") + 1
-        end_line = code[: chunk.end_index].count("\n") + 1
-
-        results.append(
-            {
-                "id": f"{filepath}:{start_line}-{end_line}",
-                "text": chunk.text,
-                "startLine": start_line,
-                "endLine": end_line,
-            }
-        )
+    # Calculate line numbers from character indices (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), *span_indices(chunks))
 
-    return results
+    return chunk_results(
+        filepath, [chunk.text for chunk in chunks], start_lines, end_lines
+    )
 
 
 def chunk_with_token_chunker(
     code: str, filepath: str, chunk_size: int, overlap: int
 ) -> list[dict[str, Any]]:
     """Chunk using Chonkie's TokenChunker (token-count based)."""
-    from chonkie import TokenChunker
+    # Built (and cached) first so invalid settings are rejected for any file
+    chunker = _get_token_chunker(chunk_size, overlap)
 
-    chunker = TokenChunker(
-        tokenizer="character",  # Use character count for consistency with other chunkers
-        chunk_size=chunk_size,
-        chunk_overlap=overlap,
-    )
+    # Fits in one chunk; blank input still goes through (the chunker drops it)
+    if len(code) <= chunk_size and not code.isspace():
+        return whole_file_result(filepath, code)
 
     chunks = chunker.chunk(code)
 
-    results = []
-    for chunk in chunks:
-        start_line = code[: chunk.start_index].count("\n") + 1
-        end_line = code[: chunk.end_index].count("\n") + 1
-
-        results.append(
-            {
-                "id": f"{filepath}:{start_line}-{end_line}",
-                "text": chunk.text,
-                "startLine": start_line,
-                "endLine": end_line,
-            }
-        )
+    # Calculate line numbers from character indices (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), *span_indices(chunks))
 
-    return results
+    return chunk_results(
+        filepath, [chunk.text for chunk in chunks], start_lines, end_lines
+    )
 
 
 def chunk_with_sentence_chunker(
     code: str, filepath: str, chunk_size: int
 ) -> list[dict[str, Any]]:
     """Chunk using Chonkie's SentenceChunker (sentence-boundary based)."""
-    from chonkie import SentenceChunker
+    # Built (and cached) first so invalid settings are rejected for any file
+    chunker = _get_sentence_chunker(chunk_size)
 
-    chunker = SentenceChunker(
-        tokenizer="character",  # Use character count
-        chunk_size=chunk_size,
-        min_sentences_per_chunk=1,
-    )
+    # Fits in one chunk; blank input still goes through (the chunker drops it)
+    if len(code) <= chunk_size and not code.isspace():
+        return whole_file_result(filepath, code)
 
     chunks = chunker.chunk(code)
 
-    results = []
-    for chunk in chunks:
-        start_line = code[: chunk.start_index].count("\n") + 1
-        end_line = code[: chunk.end_index].count("\n") + 1
-
-        results.append(
-            {
-                "id": f"{filepath}:{start_line}-{end_line}",
-                "text": chunk.text,
-                "startLine": start_line,
-                "endLine": end_line,
-            }
-        )
+    # Calculate line numbers from character indices (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), *span_indices(chunks))
+
+    return chunk_results(
+        filepath, [chunk.text for chunk in chunks], start_lines, end_lines
+    )
+
+
+def preload(name: str) -> None:
+    """Load a language's grammar and CodeChunker ahead of the first request.
+
+    name is a language or a file extension. Used by ``--server --preload``;
+    CodeChunkers for other chunk sizes are still built on first use, but
+    find the grammar already loaded.
+    """
+    language = _LANG_MAP.get(name.lower(), name)
+    tree_sitter_parser(language)  # loads the grammar into the language pack's cache
+    _get_code_chunker(language, DEFAULT_CHUNK_SIZE)
 
-    return results
+
+def parse_args(args: list[str]) -> tuple[str, str, int, int]:
+    """Parse bridge arguments (argv without the script name).
+
+    Raises:
+        ValueError: If required arguments are missing or sizes are not integers.
+    """
+    chunker_type, filepath, chunk_size, *rest = args
+    return chunker_type, filepath, int(chunk_size), int(rest[0]) if rest else 0
+
+
+def chunk_from_args(args: list[str], code: str) -> list[dict[str, Any]]:
+    """Chunk code according to bridge arguments (argv without the script name)."""
+    chunker_type, filepath, chunk_size, overlap = parse_args(args)
+
+    if chunker_type == "code":
+        return chunk_with_code_chunker(code, filepath, chunk_size)
+    elif chunker_type == "recursive":
+        return chunk_with_recursive_chunker(code, filepath, chunk_size, overlap)
+    elif chunker_type == "semantic":
+        return chunk_with_semantic_chunker(code, filepath, chunk_size)
+    elif chunker_type == "token":
+        return chunk_with_token_chunker(code, filepath, chunk_size, overlap)
+    elif chunker_type == "sentence":
+        return chunk_with_sentence_chunker(code, filepath, chunk_size)
+    raise ValueError(
+        f"Unknown chunker type: {chunker_type}. Supported: code, recursive, semantic, token, sentence"
+    )
 
 
 def main():
-    if len(sys.argv) < 4:
+    if sys.argv[1:2] == ["--server"]:
+        serve(chunk_from_args, sys.argv[2:], preload)
+        return
+
+    try:
+        parse_args(sys.argv[1:])
+    except ValueError:
         print(
             "Usage: chonkie_bridge.py <chunker_type> <filepath> <chunk_size> [<overlap>]",
             file=sys.stderr,
         )
+        print(
+            "       chonkie_bridge.py --server [--workers N] [--preload LANGS]",
+            file=sys.stderr,
+        )
         print("  chunker_type: 'code', 'recursive', 'semantic', 'token', or 'sentence'", file=sys.stderr)
         print("  Code is read from stdin", file=sys.stderr)
         sys.exit(1)
 
-    chunker_type = sys.argv[1]
-    filepath = sys.argv[2]
-    chunk_size = int(sys.argv[3])
-    overlap = int(sys.argv[4]) if len(sys.argv) > 4 else 0
-
-    # Read code from stdin
-    code = sys.stdin.read()
+    # Read code from stdin as raw bytes and decode once (no newline translation,
+    # so downstream line numbers see exactly the bytes the caller sent)
+    code = sys.stdin.buffer.read().decode("utf-8")
 
     try:
-        if chunker_type == "code":
-            results = chunk_with_code_chunker(code, filepath, chunk_size)
-        elif chunker_type == "recursive":
-            results = chunk_with_recursive_chunker(code, filepath, chunk_size, overlap)
-        elif chunker_type == "semantic":
-            results = chunk_with_semantic_chunker(code, filepath, chunk_size)
-        elif chunker_type == "token":
-            results = chunk_with_token_chunker(code, filepath, chunk_size, overlap)
-        elif chunker_type == "sentence":
-            results = chunk_with_sentence_chunker(code, filepath, chunk_size)
-        else:
-            print(
-                json.dumps({"error": f"Unknown chunker type: {chunker_type}. Supported: code, recursive, semantic, token, sentence"}),
-                file=sys.stderr,
-            )
-            sys.exit(1)
-
-        print(json.dumps(results))
-
+        results = chunk_from_args(sys.argv[1:], code)
+        write_json_array(results)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        write_json({"error": str(e)})
         sys.exit(1)
 
 
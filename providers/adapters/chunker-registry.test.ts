@@ -3,9 +3,14 @@
  *
  * Tests the chunker registration, lookup, and built-in chunker implementations.
  * Note: Chonkie-based chunkers are not tested here as they require Python runtime.
+ * The persistent bridge server is tested against a stub bridge script (python3 only).
  */
 
-import { describe, expect, it, beforeEach } from "bun:test";
+import { describe, expect, it, beforeEach, afterAll } from "bun:test";
+import { mkdtempSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import type { ProviderConfig } from "../../core/config.ts";
 import {
 	registerChunker,
 	getChunker,
@@ -14,6 +19,33 @@ import {
 	type ChunkingConfig,
 	type ChunkerDefinition,
 } from "./chunker-registry.ts";
+import { GenericChunkerProvider } from "./generic-chunker.ts";
+import {
+	callPythonBridgeServer,
+	closePythonBridgeServers,
+	releasePythonBridgeServers,
+	retainPythonBridgeServers,
+} from "./python-bridge-utils.ts";
+
+/**
+ * Stub bridge speaking the `--server` protocol of bridge_utils.serve().
+ * Replies with its pid and the request text; "fail", "exit" and "garbage"
+ * trigger an error response, a crash, and an unparseable line.
+ */
+const STUB_BRIDGE = `
+import json, os, sys
+stdin = sys.stdin.buffer
+for header in stdin:
+    request = json.loads(header)
+    text = stdin.read(request["len"]).decode("utf-8")
+    if text == "exit":
+        sys.exit(3)
+    if text == "garbage":
+        print("not json", flush=True)
+        continue
+    response = {"error": "boom"} if text == "fail" else {"pid": os.getpid(), "text": text}
+    print(json.dumps({"id": request["id"], "response": response}), flush=True)
+`;
 
 describe("chunker-registry", () => {
 	// ========================================================================
@@ -259,6 +291,116 @@ def world():
 
 			expect(preflightCalled).toBe(true);
 		});
+
+		it("runs setup on provider initialize and cleanup on provider cleanup", async () => {
+			const calls: string[] = [];
+
+			registerChunker({
+				name: "test-lifecycle-chunker",
+				preflight: async () => {
+					calls.push("preflight");
+				},
+				setup: async () => {
+					calls.push("setup");
+				},
+				cleanup: async () => {
+					calls.push("cleanup");
+				},
+				chunkFn: async () => [],
+			});
+
+			// The base provider builds an embedding client, which needs a key (never used)
+			const savedKey = process.env.OPENAI_API_KEY;
+			process.env.OPENAI_API_KEY = savedKey ?? "test-key";
+			try {
+				const provider = new GenericChunkerProvider({
+					name: "test-lifecycle-chunker",
+					displayName: "Test Lifecycle Chunker",
+					type: "local",
+				} as ProviderConfig);
+
+				await provider.initialize();
+				expect(calls).toEqual(["preflight", "setup"]);
+
+				await provider.cleanup();
+				expect(calls).toEqual(["preflight", "setup", "cleanup"]);
+			} finally {
+				if (savedKey === undefined) {
+					delete process.env.OPENAI_API_KEY;
+				} else {
+					process.env.OPENAI_API_KEY = savedKey;
+				}
+			}
+		});
+	});
+
+	// ========================================================================
+	// Persistent Python Bridge Server
+	// ========================================================================
+	describe("python bridge server", () => {
+		const scriptPath = join(mkdtempSync(join(tmpdir(), "bridge-test-")), "stub_bridge.py");
+		writeFileSync(scriptPath, STUB_BRIDGE);
+
+		const call = (text: string) =>
+			callPythonBridgeServer<{ pid: number; text: string }>(
+				scriptPath,
+				[],
+				text,
+				"python3",
+				"Stub",
+			);
+
+		afterAll(async () => {
+			await closePythonBridgeServers(scriptPath);
+		});
+
+		it("answers concurrent requests with their own responses", async () => {
+			const texts = Array.from({ length: 20 }, (_, i) => `file ${i} 你好`);
+			const results = await Promise.all(texts.map(call));
+
+			expect(results.map((r) => r.text)).toEqual(texts);
+			// All served by the same persistent process
+			expect(new Set(results.map((r) => r.pid)).size).toBe(1);
+		});
+
+		it("rejects bridge errors without restarting the server", async () => {
+			const before = await call("a");
+			await expect(call("fail")).rejects.toThrow("Stub error: boom");
+			expect((await call("b")).pid).toBe(before.pid);
+		});
+
+		it("restarts the server after it exits", async () => {
+			const before = await call("a");
+			await expect(call("exit")).rejects.toThrow("exited with code 3");
+
+			const after = await call("b");
+			expect(after.text).toBe("b");
+			expect(after.pid).not.toBe(before.pid);
+		});
+
+		it("fails pending requests and restarts on unparseable output", async () => {
+			const before = await call("a");
+			const pending = [call("garbage"), call("c")];
+			for (const request of pending) {
+				await expect(request).rejects.toThrow("Failed to parse Stub output");
+			}
+
+			const after = await call("d");
+			expect(after.text).toBe("d");
+			expect(after.pid).not.toBe(before.pid);
+		});
+
+		it("keeps the server up until the last user releases it", async () => {
+			retainPythonBridgeServers(scriptPath);
+			retainPythonBridgeServers(scriptPath);
+			const first = await call("a");
+
+			await releasePythonBridgeServers(scriptPath);
+			expect((await call("b")).pid).toBe(first.pid);
+
+			await releasePythonBridgeServers(scriptPath);
+			expect((await call("c")).pid).not.toBe(first.pid);
+		});
 	});
 
 	// ========================================================================
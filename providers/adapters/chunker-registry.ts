@@ -56,6 +56,13 @@ export interface ChunkerDefinition {
 	) => Promise<ChunkResult[]>;
 	/** Optional preflight check (e.g., verify Python deps for Chonkie) */
 	preflight?: () => Promise<void>;
+	/**
+	 * Optional per-provider setup after preflight (e.g., register as a user of a
+	 * shared Python bridge process). Undone by cleanup.
+	 */
+	setup?: () => Promise<void>;
+	/** Optional per-provider cleanup (e.g., release a persistent Python bridge process) */
+	cleanup?: () => Promise<void>;
 }
 
 /**
@@ -213,6 +220,14 @@ registerChunker({
 			);
 		}
 	},
+	setup: async () => {
+		const { retainChonkie } = await import("./chonkie-bridge.ts");
+		retainChonkie();
+	},
+	cleanup: async () => {
+		const { releaseChonkie } = await import("./chonkie-bridge.ts");
+		await releaseChonkie();
+	},
 	chunkFn: async (content, filepath, config) => {
 		const { callChonkie } = await import("./chonkie-bridge.ts");
 		const chunks = await callChonkie(filepath, content, {
@@ -243,6 +258,14 @@ registerChunker({
 			);
 		}
 	},
+	setup: async () => {
+		const { retainChonkie } = await import("./chonkie-bridge.ts");
+		retainChonkie();
+	},
+	cleanup: async () => {
+		const { releaseChonkie } = await import("./chonkie-bridge.ts");
+		await releaseChonkie();
+	},
 	chunkFn: async (content, filepath, config) => {
 		const { callChonkie } = await import("./chonkie-bridge.ts");
 		const chunks = await callChonkie(filepath, content, {
@@ -286,6 +309,14 @@ registerChunker({
 			);
 		}
 	},
+	setup: async () => {
+		const { retainLlamaIndex } = await import("./llamaindex-bridge.ts");
+		retainLlamaIndex();
+	},
+	cleanup: async () => {
+		const { releaseLlamaIndex } = await import("./llamaindex-bridge.ts");
+		await releaseLlamaIndex();
+	},
 	chunkFn: async (content, filepath, config) => {
 		const { callLlamaIndex } = await import("./llamaindex-bridge.ts");
 		const chunks = await callLlamaIndex(filepath, content, {
@@ -315,6 +346,14 @@ registerChunker({
 			);
 		}
 	},
+	setup: async () => {
+		const { retainLangChain } = await import("./langchain-bridge.ts");
+		retainLangChain();
+	},
+	cleanup: async () => {
+		const { releaseLangChain } = await import("./langchain-bridge.ts");
+		await releaseLangChain();
+	},
 	chunkFn: async (content, filepath, config) => {
 		const { callLangChain } = await import("./langchain-bridge.ts");
 		const chunks = await callLangChain(filepath, content, {
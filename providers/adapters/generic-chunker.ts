@@ -65,6 +65,18 @@ export class GenericChunkerProvider extends ChunkingProvider {
 		if (chunker.preflight) {
 			await chunker.preflight();
 		}
+
+		// Register with shared chunker resources (e.g., a Python bridge process)
+		await chunker.setup?.();
+	}
+
+	/**
+	 * Cleanup the provider.
+	 * Runs chunker cleanup (e.g., release Python bridge processes) plus base cleanup.
+	 */
+	protected override async doCleanup(): Promise<void> {
+		await getChunker(this.chunkerName)?.cleanup?.();
+		await super.doCleanup();
 	}
 
 	/**
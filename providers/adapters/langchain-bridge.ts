@@ -1,7 +1,8 @@
 /**
  * LangChain RecursiveCharacterTextSplitter Python Bridge
  *
- * TypeScript wrapper for calling LangChain text splitter via subprocess.
+ * TypeScript wrapper for calling LangChain text splitter via a persistent
+ * subprocess (started once, reused for every file).
  * Uses language-aware separators for code chunking.
  *
  * Requirements:
@@ -11,7 +12,13 @@
 
 import { dirname, join } from "node:path";
 import { fileURLToPath } from "node:url";
-import { callPythonBridge, isPythonPackageAvailable } from "./python-bridge-utils.ts";
+import {
+	callPythonBridgeServer,
+	closePythonBridgeServers,
+	isPythonPackageAvailable,
+	releasePythonBridgeServers,
+	retainPythonBridgeServers,
+} from "./python-bridge-utils.ts";
 
 // Resolve path to the Python script
 const __dirname = dirname(fileURLToPath(import.meta.url));
@@ -40,7 +47,7 @@ export interface LangChainOptions {
 }
 
 /**
- * Call LangChain RecursiveCharacterTextSplitter via subprocess.
+ * Call LangChain RecursiveCharacterTextSplitter via the persistent bridge subprocess.
  *
  * @param filepath - File path (used for language detection)
  * @param code - Source code content
@@ -55,14 +62,13 @@ export async function callLangChain(
 	const pythonPath =
 		options.pythonPath || process.env.LANGCHAIN_PYTHON_PATH || "python3";
 	const args = [
-		SCRIPT_PATH,
 		filepath,
 		String(options.chunkSize),
 		String(options.overlap ?? 100),
 	];
 
 	try {
-		return await callPythonBridge<LangChainChunkResult[]>(
+		return await callPythonBridgeServer<LangChainChunkResult[]>(
 			SCRIPT_PATH,
 			args,
 			code,
@@ -88,3 +94,25 @@ export async function isLangChainAvailable(
 		"from langchain_text_splitters import RecursiveCharacterTextSplitter",
 	);
 }
+
+/**
+ * Shut down the persistent LangChain bridge process(es).
+ */
+export async function closeLangChain(): Promise<void> {
+	await closePythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Register a user of the LangChain bridge process (see {@link releaseLangChain}).
+ */
+export function retainLangChain(): void {
+	retainPythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Release a user registered with {@link retainLangChain}; the bridge process is
+ * shut down once the last user releases it.
+ */
+export async function releaseLangChain(): Promise<void> {
+	await releasePythonBridgeServers(SCRIPT_PATH);
+}
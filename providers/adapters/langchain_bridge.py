@@ -7,6 +7,7 @@ Uses the `from_language()` factory method for language-specific separators.
 
 Usage:
     python langchain_bridge.py <filepath> [chunk_size] [overlap]
+    python langchain_bridge.py --server [--workers N]
 
     filepath: Path to the file (used for language detection)
     chunk_size: Maximum chunk size in characters (default: 1500)
@@ -14,110 +15,180 @@ Usage:
 
 Code is read from stdin. Output is JSON array of chunks.
 
+With --server, the process stays alive and answers newline-delimited requests
+whose args mirror the command line above (see bridge_utils.serve).
+--workers N chunks up to N requests in parallel (0: one worker per CPU).
+
 Install dependencies:
     pip install langchain-text-splitters
 """
 
-import json
 import sys
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any, Optional
 
+from bridge_utils import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_results,
+    line_ranges,
+    newline_offsets,
+    serve,
+    whole_file_result,
+    write_json,
+    write_json_array,
+)
+
+
+# File extension -> LangChain Language member name.
+# Only include languages confirmed to have separators defined
+# Note: Language.C and Language.CPP may not work (see langchain issue #22430)
+_LANGUAGE_NAMES = MappingProxyType({
+    "py": "PYTHON",
+    "js": "JS",
+    "ts": "TS",
+    "java": "JAVA",
+    "go": "GO",
+    "rb": "RUBY",
+    "php": "PHP",
+    "scala": "SCALA",
+    "md": "MARKDOWN",
+    "html": "HTML",
+    "rst": "RST",
+    "latex": "LATEX",
+    "tex": "LATEX",
+})
+
+
+@lru_cache(maxsize=None)
+def _language_map() -> "MappingProxyType[str, Language]":
+    """Resolve _LANGUAGE_NAMES to Language enum members once per process."""
+    from langchain_text_splitters import Language
+
+    return MappingProxyType(
+        {ext: Language[name] for ext, name in _LANGUAGE_NAMES.items()}
+    )
+
 
 def get_language_enum(filepath: str) -> Optional["Language"]:
     """Get LangChain Language enum from filepath.
 
     Returns None for unsupported languages (falls back to generic splitter).
     """
-    from langchain_text_splitters import Language
+    _, sep, ext = filepath.rpartition(".")
+    # Returns None for unsupported extensions
+    return _language_map().get(ext.lower()) if sep else None
 
-    ext = filepath.rsplit(".", 1)[-1].lower() if "." in filepath else ""
-
-    # Only include languages confirmed to have separators defined
-    # Note: Language.C and Language.CPP may not work (see langchain issue #22430)
-    lang_map = {
-        "py": Language.PYTHON,
-        "js": Language.JS,
-        "ts": Language.TS,
-        "java": Language.JAVA,
-        "go": Language.GO,
-        "rb": Language.RUBY,
-        "php": Language.PHP,
-        "scala": Language.SCALA,
-        "md": Language.MARKDOWN,
-        "html": Language.HTML,
-        "rst": Language.RST,
-        "latex": Language.LATEX,
-        "tex": Language.LATEX,
-    }
-    return lang_map.get(ext)  # Returns None for unsupported extensions
 
+@lru_cache(maxsize=64)
+def build_splitter(
+    language: Optional["Language"], chunk_size: int, overlap: int
+) -> "RecursiveCharacterTextSplitter":
+    """Build a RecursiveCharacterTextSplitter.
 
-def chunk_with_langchain(
-    code: str, filepath: str, chunk_size: int, overlap: int
-) -> list[dict[str, Any]]:
-    """Chunk using LangChain RecursiveCharacterTextSplitter with add_start_index=True."""
+    Cached so a --server process builds each configuration once.
+    """
     from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-    language = get_language_enum(filepath)
-
     if language is not None:
-        splitter = RecursiveCharacterTextSplitter.from_language(
+        return RecursiveCharacterTextSplitter.from_language(
             language=language,
             chunk_size=chunk_size,
             chunk_overlap=overlap,
-            add_start_index=True,  # Critical: returns start index in metadata
-        )
-    else:
-        # Fallback to generic recursive splitter for unsupported languages
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=overlap,
-            add_start_index=True,
         )
 
-    # Use create_documents to get metadata with start_index
-    docs = splitter.create_documents([code])
+    # Fallback to generic recursive splitter for unsupported languages
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+    )
+
+
+def find_start_indices(code: str, chunks: list[str], overlap: int) -> list[int]:
+    """Locate each split chunk in code with a single forward cursor.
+
+    Same search as LangChain's ``create_documents`` with ``add_start_index=True``
+    (each find starts where the previous chunk ended, minus the overlap), minus
+    the per-chunk Document and metadata copies.
+    """
+    starts = []
+    find = code.find
+    index = 0
+    previous_len = 0
+    for chunk in chunks:
+        index = find(chunk, max(0, index + previous_len - overlap))
+        starts.append(index)
+        previous_len = len(chunk)
+    return starts
+
+
+def chunk_with_langchain(
+    code: str, filepath: str, chunk_size: int, overlap: int
+) -> list[dict[str, Any]]:
+    """Chunk using LangChain RecursiveCharacterTextSplitter.split_text."""
+    language = get_language_enum(filepath)
+
+    # Built (and cached) first so invalid settings are rejected for any file
+    splitter = build_splitter(language, chunk_size, overlap)
+
+    if len(code) <= chunk_size:  # one chunk: the whole file, stripped like split_text
+        return whole_file_result(filepath, code, strip=True)
+
+    chunks = splitter.split_text(code)
 
-    results = []
-    for doc in docs:
-        start_idx = doc.metadata.get("start_index", 0)
-        end_idx = start_idx + len(doc.page_content)
+    starts = find_start_indices(code, chunks, overlap)
+    ends = [start_idx + len(chunk) for start_idx, chunk in zip(starts, chunks)]
 
-        # Convert character offsets to line numbers (1-indexed)
-        start_line = code[:start_idx].count("\n") + 1
-        end_line = code[:end_idx].count("\n") + 1
+    # Convert character offsets to line numbers (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), starts, ends)
 
-        results.append({
-            "id": f"{filepath}:{start_line}-{end_line}",
-            "text": doc.page_content,
-            "startLine": start_line,
-            "endLine": end_line,
-        })
+    return chunk_results(filepath, chunks, start_lines, end_lines)
 
-    return results
+
+def parse_args(args: list[str]) -> tuple[str, int, int]:
+    """Parse bridge arguments (argv without the script name).
+
+    Raises:
+        ValueError: If the filepath is missing or sizes are not integers.
+    """
+    filepath, *rest = args
+    chunk_size = int(rest[0]) if rest else DEFAULT_CHUNK_SIZE
+    overlap = int(rest[1]) if len(rest) > 1 else 100
+    return filepath, chunk_size, overlap
+
+
+def chunk_from_args(args: list[str], code: str) -> list[dict[str, Any]]:
+    """Chunk code according to bridge arguments (argv without the script name)."""
+    filepath, chunk_size, overlap = parse_args(args)
+
+    return chunk_with_langchain(code, filepath, chunk_size, overlap)
 
 
 def main():
-    if len(sys.argv) < 2:
+    if sys.argv[1:2] == ["--server"]:
+        serve(chunk_from_args, sys.argv[2:])
+        return
+
+    try:
+        parse_args(sys.argv[1:])
+    except ValueError:
         print(
             "Usage: langchain_bridge.py <filepath> [chunk_size] [overlap]",
             file=sys.stderr,
         )
+        print("       langchain_bridge.py --server [--workers N]", file=sys.stderr)
         print("  Code is read from stdin", file=sys.stderr)
         sys.exit(1)
 
-    filepath = sys.argv[1]
-    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
-    overlap = int(sys.argv[3]) if len(sys.argv) > 3 else 100
-
-    # Read code from stdin
-    code = sys.stdin.read()
+    # Read code from stdin as raw bytes and decode once (no newline translation,
+    # so downstream line numbers see exactly the bytes the caller sent)
+    code = sys.stdin.buffer.read().decode("utf-8")
 
     try:
-        results = chunk_with_langchain(code, filepath, chunk_size, overlap)
-        print(json.dumps(results))
+        results = chunk_from_args(sys.argv[1:], code)
+        write_json_array(results)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        write_json({"error": str(e)})
         sys.exit(1)
 
 
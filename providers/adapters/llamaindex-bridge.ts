@@ -1,7 +1,8 @@
 /**
  * LlamaIndex CodeSplitter Python Bridge
  *
- * TypeScript wrapper for calling LlamaIndex CodeSplitter via subprocess.
+ * TypeScript wrapper for calling LlamaIndex CodeSplitter via a persistent
+ * subprocess (started once, reused for every file).
  * Uses tree-sitter parsing for semantic code chunking.
  *
  * Requirements:
@@ -11,7 +12,13 @@
 
 import { dirname, join } from "node:path";
 import { fileURLToPath } from "node:url";
-import { callPythonBridge, isPythonPackageAvailable } from "./python-bridge-utils.ts";
+import {
+	callPythonBridgeServer,
+	closePythonBridgeServers,
+	isPythonPackageAvailable,
+	releasePythonBridgeServers,
+	retainPythonBridgeServers,
+} from "./python-bridge-utils.ts";
 
 // Resolve path to the Python script
 const __dirname = dirname(fileURLToPath(import.meta.url));
@@ -38,7 +45,7 @@ export interface LlamaIndexOptions {
 }
 
 /**
- * Call LlamaIndex CodeSplitter via subprocess.
+ * Call LlamaIndex CodeSplitter via the persistent bridge subprocess.
  *
  * @param filepath - File path (used for language detection)
  * @param code - Source code content
@@ -52,10 +59,10 @@ export async function callLlamaIndex(
 ): Promise<LlamaIndexChunkResult[]> {
 	const pythonPath =
 		options.pythonPath || process.env.LLAMAINDEX_PYTHON_PATH || "python3";
-	const args = [SCRIPT_PATH, filepath, String(options.chunkSize)];
+	const args = [filepath, String(options.chunkSize)];
 
 	try {
-		return await callPythonBridge<LlamaIndexChunkResult[]>(
+		return await callPythonBridgeServer<LlamaIndexChunkResult[]>(
 			SCRIPT_PATH,
 			args,
 			code,
@@ -81,3 +88,25 @@ export async function isLlamaIndexAvailable(
 		"from llama_index.core.node_parser import CodeSplitter",
 	);
 }
+
+/**
+ * Shut down the persistent LlamaIndex bridge process(es).
+ */
+export async function closeLlamaIndex(): Promise<void> {
+	await closePythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Register a user of the LlamaIndex bridge process (see {@link releaseLlamaIndex}).
+ */
+export function retainLlamaIndex(): void {
+	retainPythonBridgeServers(SCRIPT_PATH);
+}
+
+/**
+ * Release a user registered with {@link retainLlamaIndex}; the bridge process is
+ * shut down once the last user releases it.
+ */
+export async function releaseLlamaIndex(): Promise<void> {
+	await releasePythonBridgeServers(SCRIPT_PATH);
+}
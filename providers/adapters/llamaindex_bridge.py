@@ -7,125 +7,184 @@ Uses tree-sitter parsing for semantic code chunking.
 
 Usage:
     python llamaindex_bridge.py <filepath> <chunk_size>
+    python llamaindex_bridge.py --server [--workers N] [--preload LANGS]
 
     filepath: Path to the file (used for language detection)
     chunk_size: Maximum chunk size in characters
 
 Code is read from stdin. Output is JSON array of chunks.
 
+With --server, the process stays alive and answers newline-delimited requests
+whose args mirror the command line above (see bridge_utils.serve).
+--workers N chunks up to N requests in parallel (0: one worker per CPU).
+--preload LANGS (e.g. py,ts,go) loads those grammars before the first request.
+
 Install dependencies:
     pip install llama-index-core
     # Tree-sitter parsers are included with llama-index
 """
 
-import json
 import sys
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 
+from bridge_utils import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_results,
+    line_ranges,
+    newline_offsets,
+    serve,
+    tree_sitter_parser,
+    write_json,
+    write_json_array,
+)
+
+
+# Map extensions to LlamaIndex supported languages
+# See: https://docs.llamaindex.ai/en/stable/api_reference/node_parsers/code/
+_LANG_MAP = MappingProxyType({
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "tsx": "tsx",
+    "jsx": "javascript",
+    "rs": "rust",
+    "go": "go",
+    "java": "java",
+    "c": "c",
+    "cpp": "cpp",
+    "h": "c",
+    "hpp": "cpp",
+    "rb": "ruby",
+    "php": "php",
+    "cs": "c_sharp",
+    "swift": "swift",
+    "kt": "kotlin",
+    "scala": "scala",
+    "lua": "lua",
+    "pl": "perl",
+    "r": "r",
+    "sh": "bash",
+    "bash": "bash",
+    "zsh": "bash",
+    "ps1": "powershell",
+    "sql": "sql",
+    "md": "markdown",
+    "html": "html",
+    "css": "css",
+    "json": "json",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "toml": "toml",
+    "xml": "xml",
+})
+
 
 def get_language(filepath: str) -> str:
     """Determine programming language from file extension.
 
     Returns language name as expected by LlamaIndex CodeSplitter.
     """
-    ext = filepath.rsplit(".", 1)[-1].lower() if "." in filepath else ""
-
-    # Map extensions to LlamaIndex supported languages
-    # See: https://docs.llamaindex.ai/en/stable/api_reference/node_parsers/code/
-    lang_map = {
-        "py": "python",
-        "js": "javascript",
-        "ts": "typescript",
-        "tsx": "tsx",
-        "jsx": "javascript",
-        "rs": "rust",
-        "go": "go",
-        "java": "java",
-        "c": "c",
-        "cpp": "cpp",
-        "h": "c",
-        "hpp": "cpp",
-        "rb": "ruby",
-        "php": "php",
-        "cs": "c_sharp",
-        "swift": "swift",
-        "kt": "kotlin",
-        "scala": "scala",
-        "lua": "lua",
-        "pl": "perl",
-        "r": "r",
-        "sh": "bash",
-        "bash": "bash",
-        "zsh": "bash",
-        "ps1": "powershell",
-        "sql": "sql",
-        "md": "markdown",
-        "html": "html",
-        "css": "css",
-        "json": "json",
-        "yaml": "yaml",
-        "yml": "yaml",
-        "toml": "toml",
-        "xml": "xml",
-    }
-    return lang_map.get(ext, "python")  # Default to Python
+    _, sep, ext = filepath.rpartition(".")
+    return _LANG_MAP.get(ext.lower(), "python") if sep else "python"  # Default to Python
+
+
+@lru_cache(maxsize=64)
+def _get_code_splitter(language: str, chunk_size: int) -> "CodeSplitter":
+    """Build a CodeSplitter, cached so a --server process loads each grammar once."""
+    from llama_index.core.node_parser import CodeSplitter
+
+    return CodeSplitter(
+        language=language,
+        max_chars=chunk_size,
+        # Share one parser per language across chunk sizes (None: let LlamaIndex load it)
+        parser=tree_sitter_parser(language),
+    )
 
 
 def chunk_with_llamaindex(code: str, filepath: str, chunk_size: int) -> list[dict[str, Any]]:
     """Chunk using LlamaIndex CodeSplitter."""
     from llama_index.core import Document
-    from llama_index.core.node_parser import CodeSplitter
 
     language = get_language(filepath)
 
-    splitter = CodeSplitter(
-        language=language,
-        max_chars=chunk_size,
-    )
+    splitter = _get_code_splitter(language, chunk_size)
 
     doc = Document(text=code)
     nodes = splitter.get_nodes_from_documents([doc])
 
-    results = []
-    for node in nodes:
-        # LlamaIndex provides start_char_idx in metadata
-        start_idx = node.start_char_idx if node.start_char_idx is not None else 0
-        end_idx = node.end_char_idx if node.end_char_idx is not None else len(node.text)
+    # LlamaIndex provides start_char_idx in metadata
+    starts = [
+        node.start_char_idx if node.start_char_idx is not None else 0 for node in nodes
+    ]
+    ends = [
+        node.end_char_idx if node.end_char_idx is not None else len(node.text)
+        for node in nodes
+    ]
+
+    # Convert character offsets to line numbers (1-indexed)
+    start_lines, end_lines = line_ranges(newline_offsets(code), starts, ends)
+
+    return chunk_results(
+        filepath, [node.text for node in nodes], start_lines, end_lines
+    )
+
+
+def preload(name: str) -> None:
+    """Build a language's CodeSplitter ahead of the first request.
+
+    name is a language or a file extension. Used by ``--server --preload``;
+    the tree-sitter parser it loads is shared with every other chunk size.
+    """
+    _get_code_splitter(_LANG_MAP.get(name.lower(), name), DEFAULT_CHUNK_SIZE)
+
 
-        # Convert character offsets to line numbers (1-indexed)
-        start_line = code[:start_idx].count("\n") + 1
-        end_line = code[:end_idx].count("\n") + 1
+def parse_args(args: list[str]) -> tuple[str, int]:
+    """Parse bridge arguments (argv without the script name).
+
+    Raises:
+        ValueError: If arguments are missing or chunk_size is not an integer.
+    """
+    filepath, chunk_size, *_ = args
+    return filepath, int(chunk_size)
 
-        results.append({
-            "id": f"{filepath}:{start_line}-{end_line}",
-            "text": node.text,
-            "startLine": start_line,
-            "endLine": end_line,
-        })
 
-    return results
+def chunk_from_args(args: list[str], code: str) -> list[dict[str, Any]]:
+    """Chunk code according to bridge arguments (argv without the script name)."""
+    filepath, chunk_size = parse_args(args)
+
+    return chunk_with_llamaindex(code, filepath, chunk_size)
 
 
 def main():
-    if len(sys.argv) < 3:
+    if sys.argv[1:2] == ["--server"]:
+        serve(chunk_from_args, sys.argv[2:], preload)
+        return
+
+    try:
+        parse_args(sys.argv[1:])
+    except ValueError:
         print(
             "Usage: llamaindex_bridge.py <filepath> <chunk_size>",
             file=sys.stderr,
         )
+        print(
+            "       llamaindex_bridge.py --server [--workers N] [--preload LANGS]",
+            file=sys.stderr,
+        )
         print("  Code is read from stdin", file=sys.stderr)
         sys.exit(1)
 
-    filepath = sys.argv[1]
-    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
-
-    # Read code from stdin
-    code = sys.stdin.read()
+    # Read code from stdin as raw bytes and decode once (no newline translation,
+    # so downstream line numbers see exactly the bytes the caller sent)
+    code = sys.stdin.buffer.read().decode("utf-8")
 
     try:
-        results = chunk_with_llamaindex(code, filepath, chunk_size)
-        print(json.dumps(results))
+        results = chunk_from_args(sys.argv[1:], code)
+        write_json_array(results)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        write_json({"error": str(e)})
         sys.exit(1)
 
 
@@ -3,84 +3,307 @@
  * Consolidates common subprocess handling code used by chonkie, llamaindex, and langchain bridges.
  */
 
-import { spawn } from "node:child_process";
+import { spawn, type ChildProcessWithoutNullStreams } from "node:child_process";
+import type { Socket } from "node:net";
 
-export interface PythonBridgeResult<T> {
-	error?: string;
-	result?: T;
+/**
+ * Most recent stderr output a bridge server keeps for error messages.
+ * The process lives for the whole run, so older output is dropped.
+ */
+const STDERR_TAIL_CHARS = 8192;
+
+/**
+ * A pending request awaiting its response line from a bridge server.
+ */
+interface PendingRequest {
+	resolve: (value: unknown) => void;
+	reject: (error: Error) => void;
 }
 
 /**
- * Execute a Python script with stdin input and JSON output.
+ * Long-lived bridge process started with `--server`.
  *
- * @param scriptPath - Path to the Python script to execute
- * @param args - Command-line arguments for the Python script
- * @param stdin - String to write to the process stdin
- * @param pythonPath - Path to Python executable
- * @param bridgeName - Name of the bridge (for error messages)
- * @returns Promise resolving to parsed JSON output from the Python script
+ * Requests are written as a JSON header line followed by the raw UTF-8 code
+ * bytes; the bridge answers each with one JSON line echoing the request id, in
+ * request order (see `serve()` in bridge_utils.py). This pays the interpreter
+ * startup and the chunker imports once per run instead of once per file.
+ *
+ * A line that is not valid JSON or does not answer a pending request means the
+ * stream is out of sync, so the server is killed and every pending request
+ * fails; the next call starts a fresh one.
  */
-export async function callPythonBridge<T>(
-	scriptPath: string,
-	args: string[],
-	stdin: string,
-	pythonPath: string,
-	bridgeName: string,
-): Promise<T> {
-	return new Promise((resolve, reject) => {
-		const proc = spawn(pythonPath, args, {
+class PythonBridgeServer {
+	private readonly proc: ChildProcessWithoutNullStreams;
+	private readonly bridgeName: string;
+	private readonly onExit: () => void;
+	private readonly pending = new Map<number, PendingRequest>();
+	private readonly exited: Promise<void>;
+	private nextId = 0;
+	private stdout = "";
+	private stderr = "";
+	private closed = false;
+
+	constructor(
+		scriptPath: string,
+		pythonPath: string,
+		bridgeName: string,
+		onExit: () => void,
+	) {
+		this.bridgeName = bridgeName;
+		this.onExit = onExit;
+		// PYTHON_BRIDGE_WORKERS > 1 (or 0 for one per CPU) makes the bridge chunk
+		// concurrent requests in a process pool; responses still arrive in order.
+		// Each provider ingests one file at a time, so this only pays off when
+		// several providers running at once share this bridge process.
+		// PYTHON_BRIDGE_PRELOAD (e.g. "ts,py,go") loads those grammars at startup
+		// so the first file of each language isn't charged for it.
+		const workers = process.env.PYTHON_BRIDGE_WORKERS;
+		const preload = process.env.PYTHON_BRIDGE_PRELOAD;
+		const serverArgs = [
+			...(workers ? ["--workers", workers] : []),
+			...(preload ? ["--preload", preload] : []),
+		];
+		this.proc = spawn(pythonPath, [scriptPath, "--server", ...serverArgs], {
 			stdio: ["pipe", "pipe", "pipe"],
 		});
+		// Decode as a stream so multi-byte characters split across reads survive
+		this.proc.stdout.setEncoding("utf8");
 
-		let stdout = "";
-		let stderr = "";
-
-		proc.stdout.on("data", (data: Buffer) => {
-			stdout += data.toString();
+		this.proc.stdout.on("data", (data: string) => {
+			this.stdout += data;
+			let newline = this.stdout.indexOf("\n");
+			while (newline !== -1) {
+				const line = this.stdout.slice(0, newline);
+				this.stdout = this.stdout.slice(newline + 1);
+				this.handleResponse(line);
+				newline = this.stdout.indexOf("\n");
+			}
 		});
 
-		proc.stderr.on("data", (data: Buffer) => {
-			stderr += data.toString();
+		this.proc.stderr.setEncoding("utf8");
+		this.proc.stderr.on("data", (data: string) => {
+			this.stderr = (this.stderr + data).slice(-STDERR_TAIL_CHARS);
 		});
 
-		proc.on("close", (exitCode: number | null) => {
-			if (exitCode !== 0) {
-				reject(
+		// Writes after the bridge died fail with EPIPE; "close" reports the exit
+		this.proc.stdin.on("error", () => {});
+
+		this.exited = new Promise((resolve) => {
+			this.proc.on("close", (exitCode: number | null) => {
+				this.closed = true;
+				onExit();
+				this.failPending(
 					new Error(
-						`${bridgeName} bridge failed with exit code ${exitCode}: ${stderr || stdout}`,
+						`${bridgeName} bridge server exited with code ${exitCode}: ${this.stderr}`,
 					),
 				);
+				resolve();
+			});
+		});
+
+		this.proc.on("error", (err: Error) => {
+			this.closed = true;
+			onExit();
+			this.failPending(
+				new Error(`Failed to spawn ${bridgeName} process: ${err.message}`),
+			);
+		});
+
+		this.setActive(false);
+	}
+
+	/**
+	 * Send one request; resolves with the parsed JSON response.
+	 */
+	request<T>(args: string[], stdin: string): Promise<T> {
+		return new Promise((resolve, reject) => {
+			if (this.closed) {
+				reject(new Error(`${this.bridgeName} bridge server is not running`));
 				return;
 			}
 
-			try {
-				const result = JSON.parse(stdout);
-				if (result.error) {
-					reject(new Error(`${bridgeName} error: ${result.error}`));
-					return;
-				}
-				resolve(result as T);
-			} catch (parseError) {
-				reject(
-					new Error(
-						`Failed to parse ${bridgeName} output: ${stdout}\nStderr: ${stderr}`,
-					),
-				);
-			}
+			const code = Buffer.from(stdin, "utf8");
+			const id = this.nextId++;
+			this.pending.set(id, { resolve: resolve as (value: unknown) => void, reject });
+			this.setActive(true);
+
+			this.proc.stdin.write(`${JSON.stringify({ id, args, len: code.length })}\n`);
+			this.proc.stdin.write(code);
 		});
+	}
+
+	/**
+	 * Close stdin so the bridge drains outstanding requests and exits.
+	 */
+	async close(): Promise<void> {
+		if (this.closed) {
+			return;
+		}
+		// Stay referenced until the process is gone so callers can await it
+		this.setActive(true);
+		this.proc.stdin.end();
+		await this.exited;
+	}
+
+	private handleResponse(line: string): void {
+		if (this.closed) {
+			return;
+		}
+
+		let message: { id?: unknown; response?: { error?: string } } | null;
+		try {
+			message = JSON.parse(line);
+		} catch (parseError) {
+			this.abort(
+				new Error(
+					`Failed to parse ${this.bridgeName} output: ${line}\nStderr: ${this.stderr}`,
+				),
+			);
+			return;
+		}
 
-		proc.on("error", (err: Error) => {
-			reject(
+		const id = message?.id;
+		const request = typeof id === "number" ? this.pending.get(id) : undefined;
+		if (typeof id !== "number" || !request) {
+			this.abort(
 				new Error(
-					`Failed to spawn ${bridgeName} process: ${err.message}`,
+					`Unexpected ${this.bridgeName} output: ${line}\nStderr: ${this.stderr}`,
 				),
 			);
+			return;
+		}
+		this.pending.delete(id);
+		if (this.pending.size === 0) {
+			this.setActive(false);
+		}
+
+		const result = message?.response;
+		if (result?.error) {
+			request.reject(new Error(`${this.bridgeName} error: ${result.error}`));
+			return;
+		}
+		request.resolve(result);
+	}
+
+	/**
+	 * Give up on a server whose output can no longer be matched to requests.
+	 */
+	private abort(error: Error): void {
+		this.closed = true;
+		this.onExit();
+		this.failPending(error);
+		this.proc.kill();
+	}
+
+	private failPending(error: Error): void {
+		const requests = [...this.pending.values()];
+		this.pending.clear();
+		for (const request of requests) {
+			request.reject(error);
+		}
+	}
+
+	/**
+	 * Only keep the event loop alive while requests are outstanding, so an
+	 * idle server never prevents the CLI from exiting.
+	 */
+	private setActive(active: boolean): void {
+		const streams = [this.proc.stdin, this.proc.stdout, this.proc.stderr];
+		if (active) {
+			this.proc.ref();
+			for (const stream of streams) (stream as Partial<Socket>).ref?.();
+		} else {
+			this.proc.unref();
+			for (const stream of streams) (stream as Partial<Socket>).unref?.();
+		}
+	}
+}
+
+/** Running bridge servers, keyed by Python executable and script path. */
+const servers = new Map<string, PythonBridgeServer>();
+
+/**
+ * Execute a request against a persistent Python bridge server.
+ *
+ * The bridge process is started once (with `--server`) and reused for every
+ * call with the same script and Python executable. It is restarted
+ * automatically if it exits. Rejects if the bridge reports an error for the
+ * request or the process fails.
+ *
+ * @param scriptPath - Path to the Python script to execute
+ * @param args - Bridge arguments, as they would follow the script path on the command line
+ * @param stdin - Code to chunk
+ * @param pythonPath - Path to Python executable
+ * @param bridgeName - Name of the bridge (for error messages)
+ * @returns Promise resolving to parsed JSON output from the Python script
+ */
+export async function callPythonBridgeServer<T>(
+	scriptPath: string,
+	args: string[],
+	stdin: string,
+	pythonPath: string,
+	bridgeName: string,
+): Promise<T> {
+	const key = `${pythonPath}\0${scriptPath}`;
+	let server = servers.get(key);
+	if (!server) {
+		const created = new PythonBridgeServer(scriptPath, pythonPath, bridgeName, () => {
+			if (servers.get(key) === created) {
+				servers.delete(key);
+			}
 		});
+		server = created;
+		servers.set(key, server);
+	}
+	return server.request<T>(args, stdin);
+}
 
-		// Write input to stdin
-		proc.stdin.write(stdin);
-		proc.stdin.end();
-	});
+/** Registered users of each bridge script's servers, keyed by script path. */
+const serverUsers = new Map<string, number>();
+
+/**
+ * Register a user (e.g. a provider) of a bridge script's persistent servers.
+ *
+ * Pair with {@link releasePythonBridgeServers}. Several providers can share
+ * one script's servers, which stay up until the last of them releases them.
+ *
+ * @param scriptPath - Bridge script the caller will send requests to
+ */
+export function retainPythonBridgeServers(scriptPath: string): void {
+	serverUsers.set(scriptPath, (serverUsers.get(scriptPath) ?? 0) + 1);
+}
+
+/**
+ * Release a user registered with {@link retainPythonBridgeServers}.
+ *
+ * Shuts the script's servers down once no registered users remain.
+ *
+ * @param scriptPath - Bridge script passed to retainPythonBridgeServers
+ */
+export async function releasePythonBridgeServers(scriptPath: string): Promise<void> {
+	const users = (serverUsers.get(scriptPath) ?? 0) - 1;
+	if (users > 0) {
+		serverUsers.set(scriptPath, users);
+		return;
+	}
+	serverUsers.delete(scriptPath);
+	await closePythonBridgeServers(scriptPath);
+}
+
+/**
+ * Shut down persistent bridge servers, waiting for in-flight requests.
+ *
+ * @param scriptPath - Only close servers running this script (default: all)
+ */
+export async function closePythonBridgeServers(scriptPath?: string): Promise<void> {
+	const closing: Promise<void>[] = [];
+	for (const [key, server] of servers) {
+		if (scriptPath === undefined || key.endsWith(`\0${scriptPath}`)) {
+			servers.delete(key);
+			closing.push(server.close());
+		}
+	}
+	await Promise.all(closing);
 }
 
 /**